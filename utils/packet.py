@@ -18,10 +18,10 @@ of a Waggle node so it can be used for testing...
 '''
 from crcmod.predefined import mkCrcFun
 from struct import pack
-import io as StringIO
 import time
 import logging
 import struct
+import zlib
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -72,14 +72,39 @@ SIZE_2_TYPE[2] = '>H' # unsigned short
 SIZE_2_TYPE[4] = '>I' # unsigned int
 SIZE_2_TYPE[8] = '>q' # long long
 
+# SIZE_2_TYPE compiled once, so _pack_int does not go through the struct format cache
+_SIZE_2_STRUCT = [struct.Struct(fmt) for fmt in SIZE_2_TYPE]
+
+# Precompiled big-endian unsigned packers used by bin_pack for common sizes
+_BIN_PACKERS = {
+    1 : struct.Struct('>B').pack,
+    2 : struct.Struct('>H').pack,
+    4 : struct.Struct('>I').pack,
+    8 : struct.Struct('>Q').pack,
+}
+
+# The header as laid out on the wire, up to (and excluding) the CRC-16. The
+# 3-byte sequence numbers are split into a high byte and a low short.
+_HEADER_STRUCT = struct.Struct('>BBHIBBHQQHHBHBH')
+_HEADER_UNPACK = struct.Struct('>BBHIBBHQQHHBHBHH').unpack_from
+_CRC16_STRUCT = struct.Struct('>H')
+_FOOTER_STRUCT = struct.Struct('>I')
+
 #The total header length
 HEADER_LENGTH = 40
 FOOTER_LENGTH = 4
-MAX_SEQ_NUMBER = pow(2,8*HEADER_BYTELENGTHS["snd_seq"])
+MAX_SEQ_NUMBER = 1 << (8*HEADER_BYTELENGTHS["snd_seq"])
+# MAX_SEQ_NUMBER is a power of two, so wrapping the sequence is a bit-mask
+SEQ_MASK = MAX_SEQ_NUMBER - 1
 MAX_PACKET_SIZE = 1024
 
 VERSION = "0.3"
 
+# Human-readable protocol version for every possible version byte, and the
+# byte for VERSION itself, so headers never have to parse or format it
+_VERSION_STRINGS = ['%d.%d' % (v >> 4, v & 0xf) for v in range(256)]
+_VERSION_BYTE = _VERSION_STRINGS.index(VERSION)
+
 # Sequence becomes zero when the node starts again or when the package is
 # reimported
 SEQUENCE = 0
@@ -89,126 +114,162 @@ S_UNIQUEID_HEX=None
 
 
 #Create the CRC functions
-crc32fun = mkCrcFun('crc-32')
+# zlib.crc32 computes the same CRC-32 as crcmod's 'crc-32' but runs in C (and
+# uses the hardware/folded implementation of the underlying zlib when present).
+crc32fun = zlib.crc32
 crc16fun = mkCrcFun('crc-16')
 
+# Field offsets and widths used on every packet, resolved once at import
 crc16_position = HEADER_LOCATIONS['crc-16']
+crc16_length = HEADER_BYTELENGTHS['crc-16']
+s_uniqid_hexlength = 2*HEADER_BYTELENGTHS["s_uniqid"]
 
 
 def _pack_int(value, size):
-    return struct.pack(SIZE_2_TYPE[size], value)
+    return _SIZE_2_STRUCT[size].pack(value)
 
 
 def nodeid_int2hexstr(node_id):
     #return hex(node_id)[2:].zfill(2*HEADER_BYTELENGTHS["s_uniqid"])
-    return "%0s"%format(node_id,'x').lower().zfill(2*HEADER_BYTELENGTHS["s_uniqid"])
+    return "%0s"%format(node_id,'x').lower().zfill(s_uniqid_hexlength)
 
 def pack(header_data, message_data=""):
     """
         Takes header and message information and yields packets representing that data.
 
         :param dictionary header_data: A dictionary containing the header data
-        :param string/FileObject message_data: The data to be packed into a Packet
-        :yields: string
+        :param bytes/string/FileObject message_data: The data to be packed into a Packet
+        :yields: bytes
         :raises KeyError: A KeyError will be raised if the header_data dictionary is not properly formatted
     """
     global SEQUENCE
-    # global S_UNIQUEID_HEX_INT
-    global VERSION
-
-    #Generate the automatic fields
-    auto_header = {
-        "prot_ver"         : VERSION,
-        "flags"            : (1, 1, True),
-        "len_body"         : len(message_data),
-        "time"             : int(time.time()),
-        "snd_session"      : 0,
-        "s_uniqid"         : 0,  # S_UNIQUEID_HEX_INT,
-        "ext_header"       : 0,
-        "resp_session"     : 0,
-        "r_uniqid"         : 0,
-        "snd_seq"          : SEQUENCE,
-        "resp_seq"         : 0,
-    }
-    #and update them with user-supplied values
-    auto_header.update(header_data)
 
+    auto_header, message_data = _prepare_message(header_data, message_data)
+    length = len(message_data)
 
-    #If it's a string, make it a file object
-    if(type(message_data) is str):
-        message_data = StringIO.StringIO(message_data)
-
-    #If it's under 1K, send it off as a single packet
-    #Jump to the end of the file
-    message_data.seek(0,2)
-
-    header = None
-
-    #See if it is less than 1K
-    if(message_data.tell() < MAX_PACKET_SIZE):
-        try:
-            header = pack_header(auto_header)
-        except KeyError as e:
-            raise
-
-        #Save the short message to a string
-        message_data.seek(0)
-        msg = message_data.read()
-        message_data.close()
+    #See if it is less than 1K, if so send it off as a single packet
+    if length < MAX_PACKET_SIZE:
+        header = pack_header(auto_header)
+        msg = bytes(message_data)
 
         #Calculate the CRC, pack it all up, and return the result.
-        SEQUENCE = (SEQUENCE + 1) % MAX_SEQ_NUMBER
+        SEQUENCE = (SEQUENCE + 1) & SEQ_MASK
         msg_crc32 = bin_pack(crc32fun(msg),FOOTER_LENGTH)
 
-        yield header + msg + msg_crc32
+        yield b''.join((header, msg, msg_crc32))
 
     #Multi-packet
     else:
-        length = message_data.tell()
-        message_data.seek(0)
-        packetNum = 0
-
-        # Create smaller packets MAX_PACKET_SIZE bytes at a time, also attach packet number
-        while length > MAX_PACKET_SIZE:
-            try:
-                header = pack_header(auto_header)
-            except KeyError as e:
-                raise
-            msg = bin_pack(packetNum,4) + message_data.read(MAX_PACKET_SIZE)
-            SEQUENCE = (SEQUENCE + 1) % MAX_SEQ_NUMBER
-            packetNum += 1
-            msg_crc32 = bin_pack(crc32fun(msg),FOOTER_LENGTH)
-            yield header + msg + msg_crc32
-            length -= MAX_PACKET_SIZE
-
-        # Finish sending the message
-        if length > 0:
-            header = pack_header(auto_header)
-            msg = bin_pack(packetNum,4) + message_data.read(MAX_PACKET_SIZE)
-            SEQUENCE = (SEQUENCE + 1) % MAX_SEQ_NUMBER
-            msg_crc32 = bin_pack(crc32fun(msg),FOOTER_LENGTH)
-            yield header + msg + msg_crc32
+        # Split into MAX_PACKET_SIZE views up front, no copying until each packet is built
+        message_view = memoryview(message_data)
+        chunks = [message_view[i:i + MAX_PACKET_SIZE] for i in range(0, length, MAX_PACKET_SIZE)]
+
+        # Every chunk carries the same header, so only pack it once
+        header = pack_header(auto_header)
+
+        # Attach the packet number to each chunk. The body CRC is carried on
+        # from the packet number into the chunk, so the two are never copied
+        # together just to be checksummed.
+        for packetNum, chunk in enumerate(chunks):
+            packet_number = bin_pack(packetNum,4)
+            SEQUENCE = (SEQUENCE + 1) & SEQ_MASK
+            msg_crc32 = bin_pack(crc32fun(chunk, crc32fun(packet_number)),FOOTER_LENGTH)
+            yield b''.join((header, packet_number, chunk, msg_crc32))
+
+def pack_into(buf, offset, header_data, message_data=b""):
+    """
+        Packs header and message information straight into a caller-supplied buffer, instead of
+        allocating new packets. The packets written are exactly those pack would yield, one after
+        another starting at offset.
+
+        :param bytearray buf: A writable buffer with room for the packets
+        :param int offset: The position in buf to start writing at
+        :param dictionary header_data: A dictionary containing the header data
+        :param bytes/string/FileObject message_data: The data to be packed into a Packet
+        :rtype: int, the number of bytes written
+        :raises KeyError: A KeyError will be raised if the header_data dictionary is not properly formatted
+        :raises ValueError: A ValueError will be raised if buf is too small to hold the packets
+    """
+    global SEQUENCE
+
+    auto_header, message_data = _prepare_message(header_data, message_data)
+    length = len(message_data)
+
+    # Single packets carry just the body, larger messages also a packet number per chunk
+    if length < MAX_PACKET_SIZE:
+        size = HEADER_LENGTH + length + FOOTER_LENGTH
+    else:
+        chunk_count = -(-length // MAX_PACKET_SIZE)
+        size = chunk_count * (HEADER_LENGTH + 4 + FOOTER_LENGTH) + length
+
+    if offset + size > len(buf):
+        raise ValueError("buffer too small: %d bytes needed at offset %d, but buffer is %d bytes" % (size, offset, len(buf)))
+
+    buf_view = memoryview(buf)
+    _pack_header_into(buf, offset, auto_header)
+    position = offset + HEADER_LENGTH
+
+    if length < MAX_PACKET_SIZE:
+        buf_view[position:position + length] = message_data
+        position += length
+        _FOOTER_STRUCT.pack_into(buf, position, crc32fun(message_data))
+        SEQUENCE = (SEQUENCE + 1) & SEQ_MASK
+        return size
+
+    # Every chunk carries the same header, copy it from the one just written
+    header = buf_view[offset:offset + HEADER_LENGTH].tobytes()
+    message_view = memoryview(message_data)
+
+    for packetNum, start in enumerate(range(0, length, MAX_PACKET_SIZE)):
+        if packetNum:
+            buf_view[position:position + HEADER_LENGTH] = header
+            position += HEADER_LENGTH
+
+        chunk = message_view[start:start + MAX_PACKET_SIZE]
+        _FOOTER_STRUCT.pack_into(buf, position, packetNum)
+        msg_crc32 = crc32fun(chunk, crc32fun(buf_view[position:position + 4]))
+        position += 4
+        buf_view[position:position + len(chunk)] = chunk
+        position += len(chunk)
+        _FOOTER_STRUCT.pack_into(buf, position, msg_crc32)
+        position += FOOTER_LENGTH
+        SEQUENCE = (SEQUENCE + 1) & SEQ_MASK
+
+    return size
 
 def unpack(packet):
     """
         Turns a packet object into a tuple containing the header data and message body
 
-        :param string packet: The packet data to be unpacked
-        :rtype: tuple(dictionary, string)
+        :param bytes packet: The packet data to be unpacked
+        :rtype: tuple(dictionary, bytes)
         :raises IOError: An IOError will be raised if a CRC fails in the packet
         :raises KeyError: An IndexError will be raised if a packet header is the wrong length
     """
-    #crc32fun = mkCrcFun('crc-32')
+    # Work on views of the packet so the body is only copied once, on return
+    packet_view = memoryview(packet)
+    body = packet_view[HEADER_LENGTH:-FOOTER_LENGTH]
     header = None
-    if(crc32fun(packet[HEADER_LENGTH:-FOOTER_LENGTH]) != _bin_unpack(packet[-FOOTER_LENGTH:])):
+    if(crc32fun(body) != _bin_unpack(packet_view[-FOOTER_LENGTH:])):
         raise IOError("Packet body CRC-32 failed.")
     try:
-        header = _unpack_header(packet[:HEADER_LENGTH])
+        header = _unpack_header(packet_view[:HEADER_LENGTH])
     except Exception as e:
         logger.error("_unpack_header failed: "+str(e))
         raise
 
-    return (header, packet[HEADER_LENGTH:-FOOTER_LENGTH])
+    return (header, body.tobytes())
+
+
+def unpack_many(packets):
+    """
+        Unpacks a batch of packets, for example everything drained from a queue in one receive.
+
+        :param iterable packets: The packets to be unpacked
+        :rtype: list(tuple(dictionary, bytes))
+        :raises IOError: An IOError will be raised if a CRC fails in any of the packets
+    """
+    return [unpack(packet) for packet in packets]
 
 
 
@@ -228,34 +289,13 @@ def pack_header(header_data):
         Attempt to pack the data from the header_data dictionary into binary format according to Waggle protocol.
 
         :param dictionary header_data: The header data to be serialized
-        :rtype: string
+        :rtype: bytes
         :raises KeyError: An exception will be raised if the provided dictionary does not contain required information
     """
 
-    header = str()
-    try:
-        header += _pack_version(header_data["prot_ver"])                                                   # Serialize protocol version
-        header += _pack_flags(header_data["flags"])                                                        # Packet flags
-        header += bin_pack(header_data["len_body"],HEADER_BYTELENGTHS["len_body"])          # Length of message body
-        header += bin_pack(header_data["time"],HEADER_BYTELENGTHS["time"])                  # Timestamp
-        header += bin_pack(header_data["msg_mj_type"], HEADER_BYTELENGTHS["msg_mj_type"])   # Message Major Type
-        header += bin_pack(header_data["msg_mi_type"], HEADER_BYTELENGTHS["msg_mi_type"])   # Message Minor Type
-        header += bin_pack(header_data["ext_header"], HEADER_BYTELENGTHS["ext_header"])     # Optional extended header
-        header += bin_pack(header_data["s_uniqid"],HEADER_BYTELENGTHS["s_uniqid"])          # Sender unique ID
-        header += bin_pack(header_data["r_uniqid"],HEADER_BYTELENGTHS["r_uniqid"])          # Recipient unique ID
-        header += bin_pack(header_data["snd_session"],HEADER_BYTELENGTHS["snd_session"])    # Send session number
-        header += bin_pack(header_data["resp_session"],HEADER_BYTELENGTHS["resp_session"])  # Response session number
-        header += bin_pack(header_data["snd_seq"],HEADER_BYTELENGTHS["snd_seq"])            # Send sequence number
-        header += bin_pack(header_data["resp_seq"],HEADER_BYTELENGTHS["resp_seq"])          # Response sequence number
-    except KeyError as e:
-        raise KeyError("Header packing failed. The required dictionary entry %s was missing!" % str(e))
-
-
-    #Compute the header CRC and stick it on the end
-    #crc16 = mkCrcFun('crc-16')
-    header += bin_pack(crc16fun(header),HEADER_BYTELENGTHS['crc-16'])
-
-    return header
+    header = bytearray(HEADER_LENGTH)
+    _pack_header_into(header, 0, header_data)
+    return bytes(header)
 
 
 def get_header(packet):
@@ -295,8 +335,7 @@ def set_header_field(header_bytearray, field, value):
         logger.error(str(e))
         raise e
 
-    for i in range(field_length):
-        header_bytearray[field_position+i] = value[i]
+    header_bytearray[field_position:field_position+field_length] = value
 
 
 
@@ -305,9 +344,9 @@ def set_header_field(header_bytearray, field, value):
 """
 def write_header_crc(header_bytearray):
 
-    new_crc = crc16fun(str(header_bytearray[:crc16_position]))
+    new_crc = crc16fun(bytes(memoryview(header_bytearray)[:crc16_position]))
 
-    new_crc_packed = bin_pack(new_crc,HEADER_BYTELENGTHS['crc-16'])
+    new_crc_packed = bin_pack(new_crc,crc16_length)
 
     set_header_field(header_bytearray, 'crc-16', new_crc_packed)
 
@@ -319,14 +358,12 @@ def bin_pack(n, size):
 
         :param int n: The integer to be converted to binary
         :param int size: The number of bytes that the integer will be represented with
-        :rtype: string
+        :rtype: bytes
     """
-    packed = bytearray(size)
-
-    for i in range(1, size + 1):
-        packed[-i] = 0xff & (n >> (i - 1)*8)
-
-    return str(packed)
+    packer = _BIN_PACKERS.get(size)
+    if packer is not None:
+        return packer(n)
+    return n.to_bytes(size, 'big')
 
 
 
@@ -339,11 +376,81 @@ def bin_pack(n, size):
 """
 
 
+def _prepare_message(header_data, message_data):
+    """
+        For internal use.
+        Brings the message into memory as bytes and fills in the automatic header fields.
+
+        :param dictionary header_data: The user-supplied header data
+        :param bytes/string/FileObject message_data: The data to be packed
+        :rtype: tuple(dictionary, bytes)
+    """
+    #Bring the message into memory as bytes
+    if isinstance(message_data, str):
+        message_data = message_data.encode()
+    elif not isinstance(message_data, (bytes, bytearray, memoryview)):
+        message_data = message_data.read()
+
+    #Generate the automatic fields
+    auto_header = {
+        "prot_ver"         : VERSION,
+        "flags"            : (1, 1, True),
+        "len_body"         : len(message_data) & 0xffff,
+        "time"             : int(time.time()),
+        "snd_session"      : 0,
+        "s_uniqid"         : 0,  # S_UNIQUEID_HEX_INT,
+        "ext_header"       : 0,
+        "resp_session"     : 0,
+        "r_uniqid"         : 0,
+        "snd_seq"          : SEQUENCE,
+        "resp_seq"         : 0,
+    }
+    #and update them with user-supplied values
+    auto_header.update(header_data)
+
+    return auto_header, message_data
+
+
+def _pack_header_into(buffer, offset, header_data):
+    """
+        For internal use.
+        Packs the header_data dictionary, including its CRC-16, into buffer at offset.
+
+        :param bytearray buffer: A writable buffer with room for a header at offset
+        :param int offset: The position of the header in buffer
+        :param dictionary header_data: The header data to be serialized
+        :raises KeyError: An exception will be raised if the provided dictionary does not contain required information
+    """
+    try:
+        snd_seq = header_data["snd_seq"]
+        resp_seq = header_data["resp_seq"]
+        _HEADER_STRUCT.pack_into(buffer, offset,
+            _pack_version(header_data["prot_ver"]),     # Serialize protocol version
+            _pack_flags(header_data["flags"]),          # Packet flags
+            header_data["len_body"],                    # Length of message body
+            header_data["time"],                        # Timestamp
+            header_data["msg_mj_type"],                 # Message Major Type
+            header_data["msg_mi_type"],                 # Message Minor Type
+            header_data["ext_header"],                  # Optional extended header
+            header_data["s_uniqid"],                    # Sender unique ID
+            header_data["r_uniqid"],                    # Recipient unique ID
+            header_data["snd_session"],                 # Send session number
+            header_data["resp_session"],                # Response session number
+            snd_seq >> 16, snd_seq & 0xffff,            # Send sequence number
+            resp_seq >> 16, resp_seq & 0xffff)          # Response sequence number
+    except KeyError as e:
+        raise KeyError("Header packing failed. The required dictionary entry %s was missing!" % str(e))
+
+
+    #Compute the header CRC and write it into the last two bytes
+    _CRC16_STRUCT.pack_into(buffer, offset + crc16_position, crc16fun(bytes(memoryview(buffer)[offset:offset + crc16_position])))
+
+
 def _unpack_header(packed_header):
     """
         Given a packed header, this method will return a dictionary with the unpacked contents.
 
-        :param string packed_header: A string representing a waggle header
+        :param bytes packed_header: A bytes-like object holding a waggle header
         :rtype: Dictionary
         :raises IndexError: An IndexError will be raised if the packed header is not 40 bytes long
         :raises IOError: An IOError will be raised if the packet header fails its CRC-16 check
@@ -353,45 +460,40 @@ def _unpack_header(packed_header):
     if len(packed_header) != HEADER_LENGTH:
         raise IndexError("Tried to unpack a waggle header that was %d instead of %d bytes long." % (len(packed_header), HEADER_LENGTH ) )
 
-    header_IO = StringIO.StringIO(packed_header)
+    (prot_ver, flags, len_body, timestamp, msg_mj_type, msg_mi_type, ext_header,
+     s_uniqid, r_uniqid, snd_session, resp_session,
+     snd_seq_hi, snd_seq_lo, resp_seq_hi, resp_seq_lo, headerCRC) = _HEADER_UNPACK(packed_header)
 
     #Check the CRC
-    #CRC16 = mkCrcFun('CRC-16')
-    header_IO.seek(HEADER_LOCATIONS["crc-16"])
-    headerCRC = header_IO.read(2)
-    if(crc16fun(packed_header[:-2]) != _bin_unpack(headerCRC)):
+    if(crc16fun(bytes(memoryview(packed_header)[:-2])) != headerCRC):
         raise IOError("Header CRC-16 check failed")
-    header_IO.seek(0)
 
     # The header passed the CRC check. Hooray! Now return a dictionary containing the info.
-    header = {
-        "prot_ver"     : _unpack_version(header_IO.read(HEADER_BYTELENGTHS["prot_ver"])),        # Load protocol version
-        "flags"        : _unpack_flags(header_IO.read(HEADER_BYTELENGTHS["flags"])),             # Load flags
-        "len_body"     : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["len_body"])),            # Load message body length
-        "time"         : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["time"])),                # Load time
-        "msg_mj_type"  : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["msg_mj_type"])),         # Load message major type
-        "msg_mi_type"  : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["msg_mi_type"])),         # Load message minor type
-        "ext_header"   : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["ext_header"])),          # Load extended header
-        "s_uniqid"     : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["s_uniqid"])),            # Load sender unique ID
-        "r_uniqid"     : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["r_uniqid"])),            # Load recipient unique ID
-        "snd_session"  : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["snd_session"])),         # Load send session number
-        "resp_session" : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["resp_session"])),        # Load recipient session number
-        "snd_seq"      : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["snd_seq"])),             # Load send sequence number
-        "resp_seq"     : _bin_unpack(header_IO.read(HEADER_BYTELENGTHS["resp_seq"]))             # Load recieve sequence number
+    return {
+        "prot_ver"     : _unpack_version(prot_ver),                 # Load protocol version
+        "flags"        : _unpack_flags(flags),                      # Load flags
+        "len_body"     : len_body,                                  # Load message body length
+        "time"         : timestamp,                                 # Load time
+        "msg_mj_type"  : msg_mj_type,                               # Load message major type
+        "msg_mi_type"  : msg_mi_type,                               # Load message minor type
+        "ext_header"   : ext_header,                                # Load extended header
+        "s_uniqid"     : s_uniqid,                                  # Load sender unique ID
+        "r_uniqid"     : r_uniqid,                                  # Load recipient unique ID
+        "snd_session"  : snd_session,                               # Load send session number
+        "resp_session" : resp_session,                              # Load recipient session number
+        "snd_seq"      : (snd_seq_hi << 16) | snd_seq_lo,           # Load send sequence number
+        "resp_seq"     : (resp_seq_hi << 16) | resp_seq_lo          # Load recieve sequence number
     }
 
-    header_IO.close()
-    return header
-
 def _pack_flags(flags):
     """
         For internal use.
         Takes a tuple representing the message priorities and FIFO/LIFO preference and packs them to one byte.
 
         :param tuple(int,int,bool) flags:
-        :rtype: string
+        :rtype: int
     """
-    return chr((flags[0] << 5) | (flags[1] << 2) | (flags[2] << 1))
+    return ((flags[0] & 0x7) << 5) | ((flags[1] & 0x7) << 2) | (bool(flags[2]) << 1)
 
 
 def _unpack_flags(flagByte):
@@ -399,10 +501,12 @@ def _unpack_flags(flagByte):
         For internal use.
         Takes in the priority byte from the header and returns a tuple containing the correct information.
 
-        :param string flagByte: The priority byte from the header
+        :param int/bytes flagByte: The priority byte from the header
         :rtype: Tuple(Int, Int, Bool)
     """
-    return ((ord(flagByte) & 0xe0) >> 5, (ord(flagByte) & 0x1c) >> 2, bool((ord(flagByte) & 0x02) >> 1))
+    if not isinstance(flagByte, int):
+        flagByte = flagByte[0]
+    return ((flagByte & 0xe0) >> 5, (flagByte & 0x1c) >> 2, bool(flagByte & 0x02))
 
 
 def _unpack_version(version):
@@ -410,15 +514,11 @@ def _unpack_version(version):
         For internal use.
         Returns the protocol in string form.
 
-        :param string version: byte representing the version
+        :param int version: byte representing the version
         :rtype: string
     """
-    v = ord(version)
-    major = v & 0xf0
-    minor = v & 0x0f
-
     # return the version in human-readable form. For example: "0x03" becomes "0.3".
-    return str(major) + "." + str(minor)
+    return _VERSION_STRINGS[version]
 
 def _pack_version(version):
     """
@@ -426,13 +526,16 @@ def _pack_version(version):
         Returns the protocol as a binary
 
         :param string version: The version in human-readable format, i.e. "0.3"
-        :rtype: The protocol version as a 1 byte string
+        :rtype: The protocol version as a 1 byte int
     """
+    if version == VERSION:
+        return _VERSION_BYTE
+
     versions = version.split(".")
     major = int(versions[0])
     minor = int(versions[1])
 
-    return chr((major << 4) | (0xf & minor))
+    return (major << 4) | (0xf & minor)
 
 
 
@@ -442,12 +545,7 @@ def _bin_unpack(string):
         For internal use.
         Takes in a string and returns it in integer format
 
-        :param string string: The binary string to read
+        :param bytes string: The binary string to read
         :rtype: int
     """
-    x = 0
-
-    for i in range(1, len(string) + 1):
-        x = x | (ord(string[-i]) << (i - 1)*8)
-
-    return x
+    return int.from_bytes(string, 'big')
@@ -32,11 +32,9 @@ def readline(ser):
     while True:
         check_global_timeout()
 
-        # read and decode wagman output
-        try:
-            line = ser.readline().decode()
-        except UnicodeDecodeError:
-            continue
+        # read raw wagman output. lines are kept as bytes and only decoded
+        # once they leave the driver.
+        line = ser.readline()
 
         # handle serial port timeout with an empty response
         if len(line) == 0:
@@ -45,21 +43,23 @@ def readline(ser):
         last_readline = time.time()
 
         # show wagman log output instead of returning
-        if line.startswith('log:'):
-            content = line.replace('log:', '').strip()
-            wagman_logger.info(content)
+        if line.startswith(b'log:'):
+            content = line.replace(b'log:', b'').strip()
+            wagman_logger.info(content.decode(errors='replace'))
             continue
 
         return line
 
 
 def writeline(ser, line):
-    ser.write(line.encode())
-    ser.write(b'\n')
+    ser.write(line + b'\n')
+
+
+sanitize_pattern = re.compile(rb'@?[A-Za-z0-9]+')
 
 
 def sanitize(s):
-    return ' '.join(re.findall(r'@?[A-Za-z0-9]+', s))
+    return b' '.join(sanitize_pattern.findall(s))
 
 
 def dispatch(ser, command):
@@ -82,11 +82,10 @@ def dispatch(ser, command):
 
         logger.debug('line: %s', line)
 
-        _, sep, right = line.partition('<<<-')
-
-        if sep:
-            fields = right.split()
-            sid = fields[0].split('=')[1]
+        # most lines are not headers, so only partition once we know it is one
+        if b'<<<-' in line:
+            fields = line.partition(b'<<<-')[2].split()
+            sid = fields[0].split(b'=')[1]
             break
 
     lines = []
@@ -106,19 +105,23 @@ def dispatch(ser, command):
 
         logger.debug('line: %s', line)
 
-        if '<<<-' in line:
+        if b'<<<-' in line:
             raise RuntimeError('unexpected message header')
 
-        left, sep, _ = line.partition('->>>')
+        if b'->>>' not in line:
+            lines.append(line.strip())
+            continue
+
+        left, _, _ = line.partition(b'->>>')
 
         if left:
             lines.append(left.strip())
 
-        if sep:
-            break
+        break
 
     # need support for err reponse
-    return '@{} ok\n{}'.format(sid, '\n'.join(lines))
+    response = b'@%s ok\n%s' % (sid, b'\n'.join(lines))
+    return response.decode(errors='replace')
 
 
 def manager(ser, server):
@@ -126,22 +129,34 @@ def manager(ser, server):
 
     last_readline = time.time()
 
+    # sleep until either a request or serial output arrives instead of
+    # alternating between the two timeouts
+    serial_fd = ser.fileno()
+
+    poller = zmq.Poller()
+    poller.register(server, zmq.POLLIN)
+    poller.register(serial_fd, zmq.POLLIN)
+
     while True:
         check_global_timeout()
 
+        events = dict(poller.poll(1000))
+
         # read and process requests
-        try:
-            command = server.recv_string()
-            response = dispatch(ser, command)
-            server.send_string(response)
-        except zmq.error.Again:
-            pass
+        if server in events:
+            try:
+                command = server.recv()
+                response = dispatch(ser, command)
+                server.send_string(response)
+            except zmq.error.Again:
+                pass
 
         # read non-request lines (logging / debug)
-        try:
-            readline(ser)
-        except TimeoutError:
-            pass
+        if serial_fd in events:
+            try:
+                readline(ser)
+            except TimeoutError:
+                pass
 
 
 def main(device):
@@ -20,8 +20,10 @@ import logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
-header_prefix = '<<<-'
-footer_prefix = '->>>'
+header_prefix = b'<<<-'
+footer_prefix = b'->>>'
+log_prefix = b'log:'
+session_id_pattern = re.compile(rb'sid=(\S+)', re.I)
 
 if len(sys.argv) > 1:
     wagman_device = sys.argv[1]
@@ -37,6 +39,27 @@ last_message = ''
 symlink_not_found_msg = 'error: symlink %s not found' % (wagman_device)
 wagman_connected_msg = 'connected to %s!' % (wagman_device)
 
+
+def readlines(serial):
+    """
+    Yields stripped lines from the serial port as bytes. Whatever is waiting
+    in the input buffer is read in one call and split here, instead of going
+    through Serial.readline, which reads one byte per call.
+    """
+    pending = b''
+
+    while True:
+        data = serial.read(serial.in_waiting or 1)
+
+        if not data:
+            continue
+
+        *lines, pending = (pending + data).split(b'\n')
+
+        for line in lines:
+            yield line.strip()
+
+
 while True:
     try:
         with Serial(wagman_device, 57600, timeout=8, writeTimeout=8) as serial:
@@ -46,40 +69,38 @@ while True:
             output = []
             incommand = False
             commandname = None
-            session_id = ''
-
-            while True:
-                line = serial.readline().decode().strip()
+            session_id = b''
 
+            for line in readlines(serial):
                 if incommand:
                     if line.startswith(footer_prefix):
                         incommand = False
 
                         if session_id:
-                            header = '{} cmd.{}'.format(session_id, commandname)
+                            header = b'%s cmd.%s' % (session_id, commandname)
                         else:
-                            header = 'cmd.{}'.format(commandname)
+                            header = b'cmd.%s' % (commandname)
 
-                        body = '\n'.join(output)
+                        body = b'\n'.join(output)
 
-                        logging.debug("sending header: {}".format(header))
-                        logging.debug("sending body: {}".format(body))
+                        logging.debug("sending header: %s", header)
+                        logging.debug("sending body: %s", body)
 
-                        msg = '{}\n{}'.format(header, body)
+                        msg = b'%s\n%s' % (header, body)
 
-                        socket.send_string(msg)
+                        socket.send_string(msg.decode(errors='replace'))
                         output = []
                     else:
                         output.append(line)
                 elif line.startswith(header_prefix):
-                    session_id=''
-                    logging.debug('received header: {}'.format(line))
-                    matchObj = re.match( r'.*sid=(\S+)', line, re.M|re.I)
+                    session_id=b''
+                    logging.debug('received header: %s', line)
+                    matchObj = session_id_pattern.search(line)
                     if matchObj:
                         session_id=matchObj.group(1).rstrip()
 
                     if session_id:
-                        logging.debug("detected session_id: {}".format(session_id))
+                        logging.debug("detected session_id: %s", session_id)
                     else:
                         logging.debug("no session_id detected")
 
@@ -94,9 +115,9 @@ while True:
                     commandname = fields[-1]
 
                     incommand = True
-                elif line.startswith('log:'):
+                elif line.startswith(log_prefix):
                     logging.debug(line)
-                    socket.send_string(line)
+                    socket.send_string(line.decode(errors='replace'))
 
     except Exception as e:
         socket.send_string("error: not connected to wagman")